@@ -1,17 +1,26 @@
 # main.py (FastAPI backend)
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.decorator import cache
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
+import asyncio
 import csv
+import logging
 import io
 import sqlite3
+import queue
 import uuid
 from enum import Enum
+from contextlib import closing
 import math
+import numpy as np
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # CORS configuration
 app.add_middleware(
@@ -23,58 +32,170 @@ app.add_middleware(
 )
 
 # Database setup
-conn = sqlite3.connect('cargo.db', check_same_thread=False)
-cursor = conn.cursor()
-
-# Create tables
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS containers (
-    container_id TEXT PRIMARY KEY,
-    zone TEXT NOT NULL,
-    width REAL NOT NULL,
-    depth REAL NOT NULL,
-    height REAL NOT NULL
-)
-''')
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS items (
-    item_id TEXT PRIMARY KEY,
-    name TEXT NOT NULL,
-    width REAL NOT NULL,
-    depth REAL NOT NULL,
-    height REAL NOT NULL,
-    mass REAL NOT NULL,
-    priority INTEGER NOT NULL,
-    expiry_date TEXT,
-    usage_limit INTEGER,
-    remaining_uses INTEGER,
-    preferred_zone TEXT,
-    container_id TEXT,
-    position_start_width REAL,
-    position_start_depth REAL,
-    position_start_height REAL,
-    position_end_width REAL,
-    position_end_depth REAL,
-    position_end_height REAL,
-    is_waste BOOLEAN DEFAULT 0,
-    FOREIGN KEY (container_id) REFERENCES containers (container_id)
-)
-''')
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS logs (
-    log_id TEXT PRIMARY KEY,
-    timestamp TEXT NOT NULL,
-    user_id TEXT,
-    action_type TEXT NOT NULL,
-    item_id TEXT,
-    details TEXT,
-    FOREIGN KEY (item_id) REFERENCES items (item_id)
-)
-''')
+DB_PATH = 'cargo.db'
+POOL_SIZE = 8
+
+def connect():
+    # Autocommit mode (isolation_level=None): multi-statement writes open their
+    # own transaction with BEGIN IMMEDIATE instead of relying on implicit ones.
+    # Taking the write lock up front means a writer that reads first waits on
+    # the busy timeout rather than failing to upgrade its read lock. Pooled
+    # connections are handed to whichever thread serves the request, but only
+    # one request holds a connection at a time.
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None, cached_statements=256)
+    conn.row_factory = sqlite3.Row
+    conn.executescript('''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;
+    PRAGMA mmap_size=268435456;
+    ''')
+    return conn
+
+def init_db(conn):
+    cursor = conn.cursor()
+    
+    # Create tables
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS containers (
+        container_id TEXT PRIMARY KEY,
+        zone TEXT NOT NULL,
+        width REAL NOT NULL,
+        depth REAL NOT NULL,
+        height REAL NOT NULL
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS items (
+        item_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        width REAL NOT NULL,
+        depth REAL NOT NULL,
+        height REAL NOT NULL,
+        mass REAL NOT NULL,
+        priority INTEGER NOT NULL,
+        expiry_date TEXT,
+        usage_limit INTEGER,
+        remaining_uses INTEGER,
+        preferred_zone TEXT,
+        container_id TEXT,
+        position_start_width REAL,
+        position_start_depth REAL,
+        position_start_height REAL,
+        position_end_width REAL,
+        position_end_depth REAL,
+        position_end_height REAL,
+        is_waste BOOLEAN DEFAULT 0,
+        FOREIGN KEY (container_id) REFERENCES containers (container_id)
+    )
+    ''')
+    
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS logs (
+        log_id TEXT PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        user_id TEXT,
+        action_type TEXT NOT NULL,
+        item_id TEXT,
+        details TEXT,
+        FOREIGN KEY (item_id) REFERENCES items (item_id)
+    )
+    ''')
+    
+    # Indexes for the container, name, waste/expiry and log lookups
+    cursor.executescript('''
+    CREATE INDEX IF NOT EXISTS idx_items_container_waste_depth
+        ON items (container_id, is_waste, position_start_depth, position_start_height, position_start_width);
+    CREATE INDEX IF NOT EXISTS idx_items_name ON items (name);
+    CREATE INDEX IF NOT EXISTS idx_items_waste ON items (is_waste) WHERE is_waste = 1;
+    CREATE INDEX IF NOT EXISTS idx_items_expiry ON items (expiry_date)
+        WHERE expiry_date IS NOT NULL AND is_waste = 0;
+    CREATE INDEX IF NOT EXISTS idx_items_depleted ON items (remaining_uses)
+        WHERE usage_limit IS NOT NULL AND is_waste = 0;
+    CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs (timestamp DESC, action_type, item_id, user_id);
+    ''')
+    
+    # Full-text index over item names, kept in sync with items by triggers
+    cursor.executescript('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        name, content='items', content_rowid='rowid', tokenize='unicode61'
+    );
+
+    CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts (rowid, name) VALUES (new.rowid, new.name);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF name ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name) VALUES ('delete', old.rowid, old.name);
+        INSERT INTO items_fts (rowid, name) VALUES (new.rowid, new.name);
+    END;
 
-conn.commit()
+    -- Picks up rows written before the index existed
+    INSERT INTO items_fts (items_fts) VALUES ('rebuild');
+    ''')
+    
+    conn.commit()
+
+with closing(connect()) as setup_conn:
+    init_db(setup_conn)
+
+connection_pool = queue.Queue(maxsize=POOL_SIZE)
+for _ in range(POOL_SIZE):
+    connection_pool.put(connect())
+
+def get_conn():
+    conn = connection_pool.get()
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        connection_pool.put(conn)
+
+logger = logging.getLogger(__name__)
+
+# Log rows are queued by log_action and written in batches on a dedicated
+# connection, so request handlers never wait on a log commit. A batch that
+# keeps failing is dropped after LOG_FLUSH_RETRIES attempts so the queue
+# cannot grow without bound.
+LOG_FLUSH_INTERVAL = 0.1
+LOG_FLUSH_RETRIES = 5
+log_queue = asyncio.Queue()
+log_writer_lock = asyncio.Lock()
+log_conn = connect()
+log_flush_task = None
+log_flush_stop = asyncio.Event()
+log_flush_failures = 0
+
+# Response cache for the read-only GET endpoints. Keys leave out the pooled
+# connection so identical queries share an entry.
+def cache_key_builder(func, namespace: str = "", request=None, response=None, args=None, kwargs=None):
+    params = sorted((name, value) for name, value in (kwargs or {}).items() if name != 'conn')
+    return f"{FastAPICache.get_prefix()}:{namespace}:{func.__module__}:{func.__name__}:{params}"
+
+@app.on_event("startup")
+async def startup():
+    global log_flush_task
+    # clear() only drops keys under a non-empty prefix
+    FastAPICache.init(InMemoryBackend(), prefix="cargo", key_builder=cache_key_builder)
+    log_flush_task = asyncio.create_task(flush_logs_periodically())
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Let the flusher finish its current write rather than cancelling it,
+    # since cancelling does not stop a write already running in its thread
+    log_flush_stop.set()
+    await log_flush_task
+    try:
+        await flush_logs()
+    finally:
+        log_conn.close()
 
 # Models
 class Item(BaseModel):
@@ -163,294 +284,464 @@ class SimulateResponse(BaseModel):
 class LogsResponse(BaseModel):
     logs: List[Dict]
 
+# Bumped whenever items are written; cached retrieval steps are keyed by it
+items_version = 0
+retrieval_steps_cache = {}
+# Containers by id, cleared whenever containers are written
+container_cache = {}
+
+# Statements on the hot paths. sqlite3 caches prepared statements per
+# connection keyed by SQL text, so every caller shares one compiled copy.
+INSERT_LOG_SQL = '''
+INSERT INTO logs (log_id, timestamp, user_id, action_type, item_id, details)
+VALUES (?, ?, ?, ?, ?, ?)
+'''
+ITEM_BY_ID_SQL = 'SELECT * FROM items WHERE item_id = ?'
+CONTAINER_BY_ID_SQL = 'SELECT * FROM containers WHERE container_id = ?'
+# Items to remove before each target: everything not yet waste in the same
+# container that starts in front of it, in removal order. Each target's
+# blockers are a range seek on idx_items_container_waste_depth.
+BLOCKING_ITEMS_SQL = '''
+SELECT t.item_id AS target_id, b.item_id, b.name FROM items t
+JOIN items b ON b.container_id = t.container_id AND b.is_waste = 0
+    AND b.position_start_depth < t.position_start_depth
+WHERE t.item_id IN ({})
+ORDER BY b.position_start_depth ASC, b.position_start_height ASC, b.position_start_width ASC
+'''
+USE_ITEM_SQL = 'UPDATE items SET remaining_uses = ? WHERE item_id = ?'
+
 # Helper functions
+def items_changed():
+    global items_version
+    items_version += 1
+    retrieval_steps_cache.clear()
+
 def log_action(user_id: str, action_type: str, item_id: str = None, details: str = None):
     log_id = str(uuid.uuid4())
     timestamp = datetime.utcnow().isoformat()
-    cursor.execute('''
-    INSERT INTO logs (log_id, timestamp, user_id, action_type, item_id, details)
-    VALUES (?, ?, ?, ?, ?, ?)
-    ''', (log_id, timestamp, user_id, action_type, item_id, details))
-    conn.commit()
+    log_queue.put_nowait((log_id, timestamp, user_id, action_type, item_id, details))
 
-def get_item_by_id(item_id: str):
-    cursor.execute('SELECT * FROM items WHERE item_id = ?', (item_id,))
-    return cursor.fetchone()
+def write_logs(rows: List[tuple]):
+    log_conn.execute('BEGIN IMMEDIATE')
+    try:
+        log_conn.executemany(INSERT_LOG_SQL, rows)
+        log_conn.commit()
+    except Exception:
+        log_conn.rollback()
+        raise
 
-def get_container_by_id(container_id: str):
-    cursor.execute('SELECT * FROM containers WHERE container_id = ?', (container_id,))
-    return cursor.fetchone()
+async def flush_logs():
+    global log_flush_failures
+    async with log_writer_lock:
+        rows = []
+        while not log_queue.empty():
+            rows.append(log_queue.get_nowait())
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(write_logs, rows)
+        except Exception:
+            log_flush_failures += 1
+            if log_flush_failures < LOG_FLUSH_RETRIES:
+                # Keep the rows for the next flush
+                for row in rows:
+                    log_queue.put_nowait(row)
+            else:
+                logger.error("Dropping %d log rows after %d failed flushes", len(rows), log_flush_failures)
+                log_flush_failures = 0
+            raise
+        log_flush_failures = 0
 
-def get_items_in_container(container_id: str):
-    cursor.execute('''
-    SELECT * FROM items 
-    WHERE container_id = ? AND is_waste = 0
-    ORDER BY position_start_depth ASC, position_start_height ASC, position_start_width ASC
-    ''', (container_id,))
-    return cursor.fetchall()
-
-def calculate_retrieval_steps(container_id: str, target_item_id: str):
-    items = get_items_in_container(container_id)
-    target_item = None
-    blocking_items = []
-    
-    for item in items:
-        if item[0] == target_item_id:
-            target_item = item
-            break
-    
-    if not target_item:
-        return []
-    
-    target_depth = target_item[11]  # position_start_depth
-    steps = []
+async def flush_logs_periodically():
+    while not log_flush_stop.is_set():
+        await asyncio.sleep(LOG_FLUSH_INTERVAL)
+        try:
+            await flush_logs()
+        except Exception:
+            logger.exception("Failed to write queued log rows")
+
+def get_container_by_id(conn: sqlite3.Connection, container_id: str):
+    if container_id not in container_cache:
+        container_cache[container_id] = conn.execute(CONTAINER_BY_ID_SQL, (container_id,)).fetchone()
+    return container_cache[container_id]
+
+def get_blocking_items(conn: sqlite3.Connection, target_item_ids: List[str]):
+    # Blocking rows for several targets in one query, grouped by target id
+    rows = conn.execute(
+        BLOCKING_ITEMS_SQL.format(', '.join('?' * len(target_item_ids))), target_item_ids
+    ).fetchall()
+    blocking_items = {}
+    for row in rows:
+        blocking_items.setdefault(row['target_id'], []).append(row)
+    return blocking_items
+
+def removal_steps(blocking_items):
+    return [{
+        'step': i,
+        'action': 'remove',
+        'itemId': item['item_id'],
+        'itemName': item['name']
+    } for i, item in enumerate(blocking_items, 1)]
+
+def calculate_retrieval_steps(conn: sqlite3.Connection, target_item: sqlite3.Row):
+    # target_item is the caller's row for the item, so it is not fetched again
+    target_item_id = target_item['item_id']
+    key = (target_item['container_id'], target_item_id, items_version)
+    if key in retrieval_steps_cache:
+        return retrieval_steps_cache[key]
     
-    for item in items:
-        if item[11] < target_depth:  # Items in front of target
-            steps.append({
-                'step': len(steps) + 1,
-                'action': 'remove',
-                'itemId': item[0],
-                'itemName': item[1]
-            })
+    if not target_item['container_id'] or target_item['is_waste']:
+        steps = []
+    else:
+        steps = removal_steps(get_blocking_items(conn, [target_item_id]).get(target_item_id, []))
     
+    retrieval_steps_cache[key] = steps
     return steps
 
-def check_item_expiry():
+def item_position(item: sqlite3.Row):
+    return {
+        'startCoordinates': {
+            'width': item['position_start_width'],
+            'depth': item['position_start_depth'],
+            'height': item['position_start_height']
+        },
+        'endCoordinates': {
+            'width': item['position_end_width'],
+            'depth': item['position_end_depth'],
+            'height': item['position_end_height']
+        }
+    }
+
+def check_item_expiry(conn: sqlite3.Connection):
+    # Runs inside the caller's transaction; the caller commits
     current_date = datetime.utcnow().date().isoformat()
-    cursor.execute('''
+    cursor = conn.execute('''
     UPDATE items 
     SET is_waste = 1 
     WHERE expiry_date IS NOT NULL AND expiry_date <= ? AND is_waste = 0
     ''', (current_date,))
-    conn.commit()
+    if cursor.rowcount > 0:
+        items_changed()
 
-def mark_depleted_items():
-    cursor.execute('''
+def flag_waste_items(conn: sqlite3.Connection, current_date: str):
+    # Marks expired and used-up items in one pass (two partial-index searches)
+    # and returns only the rows it flagged
+    flagged = conn.execute('''
     UPDATE items 
     SET is_waste = 1 
-    WHERE usage_limit IS NOT NULL AND remaining_uses <= 0 AND is_waste = 0
-    ''', ())
+    WHERE (expiry_date IS NOT NULL AND expiry_date <= ? AND is_waste = 0)
+       OR (usage_limit IS NOT NULL AND remaining_uses <= 0 AND is_waste = 0)
+    RETURNING *
+    ''', (current_date,)).fetchall()
+    if flagged:
+        items_changed()
+    return flagged
+
+def insert_rows(conn: sqlite3.Connection, sql: str, rows: List[tuple], errors: List[Dict]):
+    # Insert (row_number, params) pairs in one transaction. On a constraint
+    # violation the batch is rolled back and replayed row by row so every
+    # bad row still ends up in errors.
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        cursor.executemany(sql, (params for _, params in rows))
+        conn.commit()
+        return len(rows)
+    except sqlite3.IntegrityError:
+        conn.rollback()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    imported = 0
+    cursor.execute('BEGIN IMMEDIATE')
+    for i, params in rows:
+        try:
+            cursor.execute(sql, params)
+            imported += 1
+        except sqlite3.IntegrityError as e:
+            errors.append({'row': i, 'message': str(e)})
     conn.commit()
+    errors.sort(key=lambda error: error['row'])
+    return imported
 
 # 3D Bin Packing Algorithm
+class Rect:
+    __slots__ = ('min_x', 'min_y', 'min_z', 'max_x', 'max_y', 'max_z')
+    
+    def __init__(self, min_x, min_y, min_z, max_x, max_y, max_z):
+        self.min_x = min_x
+        self.min_y = min_y
+        self.min_z = min_z
+        self.max_x = max_x
+        self.max_y = max_y
+        self.max_z = max_z
+
+def first_fit(free_width, free_height, free_depth, count, item_width, item_height, item_depth):
+    if count == 0:
+        return -1
+    fits = (free_width[:count] >= item_width) & (free_height[:count] >= item_height) & (free_depth[:count] >= item_depth)
+    i = int(fits.argmax())
+    return i if fits[i] else -1
+
 class MaximalRectangleBinPack:
+    # Rows of the free rectangle array
+    SCORE, X, Y, Z, WIDTH, HEIGHT, DEPTH = range(7)
+    
     def __init__(self, width, height, depth):
         self.width = width
         self.height = height
         self.depth = depth
         self.used_rectangles = []
-        self.free_rectangles = [{'x': 0, 'y': 0, 'z': 0, 'width': width, 'height': height, 'depth': depth}]
+        # One row per field (struct of arrays), one column per free rectangle.
+        # Columns are kept sorted by score, ties in insertion order. The
+        # priority term of the score is the same for every free rectangle, so
+        # the first one that fits is always the best candidate.
+        self.free_rectangles = np.empty((7, 64))
+        self.free_count = 0
+        # Smallest side and volume of any item still to be placed, set by prune
+        self.min_side = 0
+        self.min_volume = 0
+        self.add_free_rectangle(0, 0, 0, width, height, depth)
+    
+    def too_small(self, width, height, depth):
+        # No rotation of any remaining item fits. The volume check leaves a
+        # little slack for rounding in the products.
+        return min(width, height, depth) < self.min_side or width * height * depth < self.min_volume * (1 - 1e-9)
+    
+    def prune(self, min_side, min_volume):
+        # Drop free rectangles that none of the remaining items can use, so
+        # later searches skip the slivers left behind by earlier splits
+        if min_side <= self.min_side and min_volume <= self.min_volume:
+            return
+        self.min_side = max(min_side, self.min_side)
+        self.min_volume = max(min_volume, self.min_volume)
+        
+        free, count = self.free_rectangles, self.free_count
+        # The width, height and depth rows are adjacent, so both tests reduce
+        # over one (3, count) view
+        sizes = free[self.WIDTH:self.DEPTH + 1, :count]
+        keep = (sizes.min(axis=0) >= self.min_side) & (sizes.prod(axis=0) >= self.min_volume * (1 - 1e-9))
+        kept = int(keep.sum())
+        if kept < count:
+            free[:, :kept] = free[:, :count][:, keep]
+            self.free_count = kept
+    
+    def add_free_rectangle(self, x, y, z, width, height, depth):
+        if self.too_small(width, height, depth):
+            return
+        
+        free, count = self.free_rectangles, self.free_count
+        if count == free.shape[1]:
+            free = self.free_rectangles = np.concatenate((free, np.empty_like(free)), axis=1)
+        
+        score = self.score_by_priority(Rect(x, y, z, x + width, y + height, z + depth), 0)
+        i = np.searchsorted(free[self.SCORE, :count], score, side='right')
+        free[:, i + 1:count + 1] = free[:, i:count]
+        free[:, i] = (score, x, y, z, width, height, depth)
+        self.free_count = count + 1
     
     def insert(self, item_width, item_height, item_depth, priority):
-        best_score = float('inf')
-        best_rect = None
-        best_free_index = -1
-        
-        for i, free_rect in enumerate(self.free_rectangles):
-            if free_rect['width'] >= item_width and free_rect['height'] >= item_height and free_rect['depth'] >= item_depth:
-                score = self.score_by_priority(free_rect, priority)
-                if score < best_score:
-                    best_score = score
-                    best_rect = free_rect.copy()
-                    best_free_index = i
-        
-        if best_rect is None:
+        free, count = self.free_rectangles, self.free_count
+        i = first_fit(free[self.WIDTH], free[self.HEIGHT], free[self.DEPTH], count, item_width, item_height, item_depth)
+        if i < 0:
             return None
         
+        _, x, y, z, width, height, depth = free[:, i].tolist()
+        free[:, i:count - 1] = free[:, i + 1:count]
+        self.free_count = count - 1
+        
         # Place the item
-        new_rect = {
-            'x': best_rect['x'],
-            'y': best_rect['y'],
-            'z': best_rect['z'],
-            'width': item_width,
-            'height': item_height,
-            'depth': item_depth
-        }
+        new_rect = Rect(x, y, z, x + item_width, y + item_height, z + item_depth)
         self.used_rectangles.append(new_rect)
         
         # Split the remaining space
-        remaining_width = best_rect['width'] - item_width
-        remaining_height = best_rect['height'] - item_height
-        remaining_depth = best_rect['depth'] - item_depth
+        remaining_width = width - item_width
+        remaining_height = height - item_height
+        remaining_depth = depth - item_depth
         
         if remaining_width > 0 and remaining_height > 0 and remaining_depth > 0:
             # Split into 3 new rectangles
-            self.free_rectangles.append({
-                'x': best_rect['x'] + item_width,
-                'y': best_rect['y'],
-                'z': best_rect['z'],
-                'width': remaining_width,
-                'height': item_height,
-                'depth': item_depth
-            })
-            self.free_rectangles.append({
-                'x': best_rect['x'],
-                'y': best_rect['y'] + item_height,
-                'z': best_rect['z'],
-                'width': best_rect['width'],
-                'height': remaining_height,
-                'depth': item_depth
-            })
-            self.free_rectangles.append({
-                'x': best_rect['x'],
-                'y': best_rect['y'],
-                'z': best_rect['z'] + item_depth,
-                'width': best_rect['width'],
-                'height': best_rect['height'],
-                'depth': remaining_depth
-            })
-        
-        del self.free_rectangles[best_free_index]
+            self.add_free_rectangle(x + item_width, y, z, remaining_width, item_height, item_depth)
+            self.add_free_rectangle(x, y + item_height, z, width, remaining_height, item_depth)
+            self.add_free_rectangle(x, y, z + item_depth, width, height, remaining_depth)
         
         return new_rect
     
     def score_by_priority(self, rect, priority):
         # Higher priority items should be closer to the front (lower z)
         # and more accessible (lower x and y)
-        return rect['z'] * 0.5 + rect['x'] * 0.3 + rect['y'] * 0.2 - priority * 0.1
+        return rect.min_z * 0.5 + rect.min_x * 0.3 + rect.min_y * 0.2 - priority * 0.1
 
-# API Endpoints
-@app.post("/api/placement", response_model=PlacementResponse)
-async def placement_recommendations(request: PlacementRequest):
-    try:
-        # Save containers to DB
-        for container in request.containers:
-            cursor.execute('''
-            INSERT OR REPLACE INTO containers (container_id, zone, width, depth, height)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (container.containerId, container.zone, container.width, container.depth, container.height))
-        
-        # Initialize bin packers for each container
-        containers = {}
-        for container in request.containers:
-            containers[container.containerId] = {
-                'bin_packer': MaximalRectangleBinPack(container.width, container.height, container.depth),
-                'zone': container.zone
-            }
-        
-        # Sort items by priority (descending) and size (ascending)
-        sorted_items = sorted(request.items, key=lambda x: (-x.priority, x.width * x.height * x.depth))
+def run_placement(conn: sqlite3.Connection, request: PlacementRequest):
+    # CPU-bound packing plus the SQLite writes; runs off the event loop.
+    # Packing needs nothing from the database, so no transaction is open
+    # until the results are written.
+    
+    # Initialize bin packers for each container
+    containers = {}
+    for container in request.containers:
+        containers[container.containerId] = {
+            'bin_packer': MaximalRectangleBinPack(container.width, container.height, container.depth),
+            'zone': container.zone
+        }
+    
+    # Sort items by priority (descending), then longest side and volume
+    # (both descending) so large items claim space before it fragments
+    sorted_items = sorted(
+        request.items,
+        key=lambda x: (-x.priority, -max(x.width, x.height, x.depth), -(x.width * x.height * x.depth))
+    )
+    
+    # Smallest side and volume among the items from each position onwards
+    remaining_min_side = [0] * len(sorted_items)
+    remaining_min_volume = [0] * len(sorted_items)
+    min_side = min_volume = float('inf')
+    for i in range(len(sorted_items) - 1, -1, -1):
+        item = sorted_items[i]
+        min_side = min(min_side, item.width, item.height, item.depth)
+        min_volume = min(min_volume, item.width * item.height * item.depth)
+        remaining_min_side[i] = min_side
+        remaining_min_volume[i] = min_volume
+    
+    placements = []
+    rearrangements = []
+    item_rows = []
+    
+    for i, item in enumerate(sorted_items):
+        placed = False
+        for container in containers.values():
+            container['bin_packer'].prune(remaining_min_side[i], remaining_min_volume[i])
         
-        placements = []
-        rearrangements = []
+        preferred_containers = [c for c in request.containers if c.zone == item.preferredZone]
+        other_containers = [c for c in request.containers if c.zone != item.preferredZone]
         
-        for item in sorted_items:
-            placed = False
-            preferred_containers = [c for c in request.containers if c.zone == item.preferredZone]
-            other_containers = [c for c in request.containers if c.zone != item.preferredZone]
+        # Try preferred containers first
+        for container in preferred_containers + other_containers:
+            bin_packer = containers[container.containerId]['bin_packer']
             
-            # Try preferred containers first
-            for container in preferred_containers + other_containers:
-                bin_packer = containers[container.containerId]['bin_packer']
-                
-                # Try all possible rotations
-                rotations = [
-                    (item.width, item.height, item.depth),
-                    (item.width, item.depth, item.height),
-                    (item.height, item.width, item.depth),
-                    (item.height, item.depth, item.width),
-                    (item.depth, item.width, item.height),
-                    (item.depth, item.height, item.width)
-                ]
-                
-                for rot in rotations:
-                    rect = bin_packer.insert(rot[0], rot[1], rot[2], item.priority)
-                    if rect:
-                        placements.append({
-                            'itemId': item.itemId,
-                            'containerId': container.containerId,
-                            'position': {
-                                'startCoordinates': {
-                                    'width': rect['x'],
-                                    'depth': rect['z'],
-                                    'height': rect['y']
-                                },
-                                'endCoordinates': {
-                                    'width': rect['x'] + rect['width'],
-                                    'depth': rect['z'] + rect['depth'],
-                                    'height': rect['y'] + rect['height']
-                                }
+            # Try all possible rotations
+            rotations = [
+                (item.width, item.height, item.depth),
+                (item.width, item.depth, item.height),
+                (item.height, item.width, item.depth),
+                (item.height, item.depth, item.width),
+                (item.depth, item.width, item.height),
+                (item.depth, item.height, item.width)
+            ]
+            
+            for rot in rotations:
+                rect = bin_packer.insert(rot[0], rot[1], rot[2], item.priority)
+                if rect:
+                    placements.append({
+                        'itemId': item.itemId,
+                        'containerId': container.containerId,
+                        'position': {
+                            'startCoordinates': {
+                                'width': rect.min_x,
+                                'depth': rect.min_z,
+                                'height': rect.min_y
+                            },
+                            'endCoordinates': {
+                                'width': rect.max_x,
+                                'depth': rect.max_z,
+                                'height': rect.max_y
                             }
-                        })
-                        
-                        # Save to DB
-                        cursor.execute('''
-                        INSERT INTO items (
-                            item_id, name, width, depth, height, mass, priority, 
-                            expiry_date, usage_limit, remaining_uses, preferred_zone,
-                            container_id, position_start_width, position_start_depth, 
-                            position_start_height, position_end_width, position_end_depth, 
-                            position_end_height, is_waste
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            item.itemId, item.name, item.width, item.depth, item.height, item.mass, item.priority,
-                            item.expiryDate, item.usageLimit, item.usageLimit, item.preferredZone,
-                            container.containerId, rect['x'], rect['z'], rect['y'],
-                            rect['x'] + rect['width'], rect['z'] + rect['depth'], rect['y'] + rect['height'], 0
-                        ))
-                        
-                        placed = True
-                        break
-                    if placed:
-                        break
+                        }
+                    })
+                    
+                    item_rows.append((
+                        item.itemId, item.name, item.width, item.depth, item.height, item.mass, item.priority,
+                        item.expiryDate, item.usageLimit, item.usageLimit, item.preferredZone,
+                        container.containerId, rect.min_x, rect.min_z, rect.min_y,
+                        rect.max_x, rect.max_z, rect.max_y, 0
+                    ))
+                    
+                    placed = True
+                    break
                 if placed:
                     break
-            
-            if not placed:
-                # Need to rearrange - find lower priority items to move
-                # (Implementation simplified for this example)
-                pass
+            if placed:
+                break
         
-        conn.commit()
-        return PlacementResponse(success=True, placements=placements, rearrangements=rearrangements)
+        if not placed:
+            # Need to rearrange - find lower priority items to move
+            # (Implementation simplified for this example)
+            pass
+    
+    # Save containers and all placed items in one short write transaction
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    cursor.executemany('''
+    INSERT OR REPLACE INTO containers (container_id, zone, width, depth, height)
+    VALUES (?, ?, ?, ?, ?)
+    ''', [(c.containerId, c.zone, c.width, c.depth, c.height) for c in request.containers])
+    cursor.executemany('''
+    INSERT INTO items (
+        item_id, name, width, depth, height, mass, priority, 
+        expiry_date, usage_limit, remaining_uses, preferred_zone,
+        container_id, position_start_width, position_start_depth, 
+        position_start_height, position_end_width, position_end_depth, 
+        position_end_height, is_waste
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', item_rows)
+    
+    conn.commit()
+    return PlacementResponse(success=True, placements=placements, rearrangements=rearrangements)
+
+# API Endpoints
+@app.post("/api/placement", response_model=PlacementResponse)
+async def placement_recommendations(request: PlacementRequest, conn: sqlite3.Connection = Depends(get_conn)):
+    try:
+        response = await asyncio.to_thread(run_placement, conn, request)
+        container_cache.clear()
+        items_changed()
+        await FastAPICache.clear()
+        return response
     except Exception as e:
+        conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/search", response_model=SearchResponse)
-async def search_item(itemId: Optional[str] = None, itemName: Optional[str] = None, userId: Optional[str] = None):
+@cache(expire=5)
+async def search_item(
+    itemId: Optional[str] = None,
+    itemName: Optional[str] = None,
+    userId: Optional[str] = None,
+    conn: sqlite3.Connection = Depends(get_conn)
+):
     try:
+        cursor = conn.cursor()
         if not itemId and not itemName:
             raise HTTPException(status_code=400, detail="Either itemId or itemName must be provided")
         
-        query = 'SELECT * FROM items WHERE '
-        params = []
-        
         if itemId:
-            query += 'item_id = ?'
-            params.append(itemId)
+            cursor.execute(ITEM_BY_ID_SQL, (itemId,))
         else:
-            query += 'name LIKE ?'
-            params.append(f'%{itemName}%')
+            # Prefix match on the quoted phrase so user input is never parsed as FTS syntax
+            phrase = '"' + itemName.replace('"', '""') + '"*'
+            cursor.execute('''
+            SELECT i.* FROM items i
+            JOIN items_fts f ON i.rowid = f.rowid
+            WHERE items_fts MATCH ?
+            ''', (phrase,))
         
-        cursor.execute(query, params)
         item = cursor.fetchone()
         
         if not item:
             return SearchResponse(success=True, found=False)
         
-        retrieval_steps = calculate_retrieval_steps(item[12], item[0]) if item[12] else []
+        retrieval_steps = calculate_retrieval_steps(conn, item)
         
         return SearchResponse(
             success=True,
             found=True,
             item={
-                'itemId': item[0],
-                'name': item[1],
-                'containerId': item[12],
-                'zone': get_container_by_id(item[12])[1] if item[12] else None,
-                'position': {
-                    'startCoordinates': {
-                        'width': item[13],
-                        'depth': item[14],
-                        'height': item[15]
-                    },
-                    'endCoordinates': {
-                        'width': item[16],
-                        'depth': item[17],
-                        'height': item[18]
-                    }
-                }
+                'itemId': item['item_id'],
+                'name': item['name'],
+                'containerId': item['container_id'],
+                'zone': get_container_by_id(conn, item['container_id'])['zone'] if item['container_id'] else None,
+                'position': item_position(item)
             },
             retrievalSteps=retrieval_steps
         )
@@ -458,30 +749,37 @@ async def search_item(itemId: Optional[str] = None, itemName: Optional[str] = No
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/retrieve", response_model=Dict)
-async def retrieve_item(request: RetrieveRequest):
+async def retrieve_item(request: RetrieveRequest, conn: sqlite3.Connection = Depends(get_conn)):
     try:
-        cursor.execute('SELECT * FROM items WHERE item_id = ?', (request.itemId,))
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute(ITEM_BY_ID_SQL, (request.itemId,))
         item = cursor.fetchone()
         
         if not item:
             raise HTTPException(status_code=404, detail="Item not found")
         
         # Decrement remaining uses if applicable
-        if item[9] is not None:  # remaining_uses
-            new_uses = item[9] - 1
-            cursor.execute('UPDATE items SET remaining_uses = ? WHERE item_id = ?', (new_uses, request.itemId))
-        
-        # Log the retrieval
-        log_action(request.userId, "retrieval", request.itemId, f"Retrieved from container {item[12]}")
+        if item['remaining_uses'] is not None:
+            new_uses = item['remaining_uses'] - 1
+            cursor.execute(USE_ITEM_SQL, (new_uses, request.itemId))
         
         conn.commit()
+        items_changed()
+        
+        # Log the retrieval
+        log_action(request.userId, "retrieval", request.itemId, f"Retrieved from container {item['container_id']}")
+        await FastAPICache.clear()
         return {"success": True}
     except Exception as e:
+        conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/place", response_model=Dict)
-async def place_item(request: PlaceRequest):
+async def place_item(request: PlaceRequest, conn: sqlite3.Connection = Depends(get_conn)):
     try:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
         cursor.execute('''
         UPDATE items 
         SET container_id = ?,
@@ -503,50 +801,53 @@ async def place_item(request: PlaceRequest):
             request.itemId
         ))
         
+        conn.commit()
+        items_changed()
+        
         log_action(request.userId, "placement", request.itemId, 
                   f"Placed in container {request.containerId} at {request.position}")
-        
-        conn.commit()
+        await FastAPICache.clear()
         return {"success": True}
     except Exception as e:
+        conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/waste/identify", response_model=WasteIdentifyResponse)
-async def identify_waste():
+async def identify_waste(conn: sqlite3.Connection = Depends(get_conn)):
     try:
-        check_item_expiry()
-        mark_depleted_items()
+        cursor = conn.cursor()
+        # ISO dates compare correctly as strings
+        today = datetime.utcnow().date().isoformat()
         
+        cursor.execute('BEGIN IMMEDIATE')
         cursor.execute('SELECT * FROM items WHERE is_waste = 1')
         waste_items = cursor.fetchall()
+        flagged = flag_waste_items(conn, today)
+        conn.commit()
+        if flagged:
+            await FastAPICache.clear()
+        waste_items += flagged
         
         return WasteIdentifyResponse(
             success=True,
             wasteItems=[{
-                'itemId': item[0],
-                'name': item[1],
-                'reason': 'Expired' if item[7] and datetime.strptime(item[7], '%Y-%m-%d').date() <= datetime.utcnow().date() else 'Out of Uses',
-                'containerId': item[12],
-                'position': {
-                    'startCoordinates': {
-                        'width': item[13],
-                        'depth': item[14],
-                        'height': item[15]
-                    },
-                    'endCoordinates': {
-                        'width': item[16],
-                        'depth': item[17],
-                        'height': item[18]
-                    }
-                }
+                'itemId': item['item_id'],
+                'name': item['name'],
+                'reason': 'Expired' if item['expiry_date'] and item['expiry_date'] <= today else 'Out of Uses',
+                'containerId': item['container_id'],
+                'position': item_position(item)
             } for item in waste_items]
         )
     except Exception as e:
+        conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/waste/return-plan", response_model=ReturnPlanResponse)
-async def waste_return_plan(request: ReturnPlanRequest):
+async def waste_return_plan(request: ReturnPlanRequest, conn: sqlite3.Connection = Depends(get_conn)):
     try:
+        cursor = conn.cursor()
+        # ISO dates compare correctly as strings
+        today = datetime.utcnow().date().isoformat()
         cursor.execute('''
         SELECT * FROM items 
         WHERE is_waste = 1
@@ -559,32 +860,34 @@ async def waste_return_plan(request: ReturnPlanRequest):
         return_plan = []
         
         for item in waste_items:
-            if total_weight + item[6] > request.maxWeight:
+            if total_weight + item['mass'] > request.maxWeight:
                 continue
             
             return_items.append({
-                'itemId': item[0],
-                'name': item[1],
-                'reason': 'Expired' if item[7] and datetime.strptime(item[7], '%Y-%m-%d').date() <= datetime.utcnow().date() else 'Out of Uses'
+                'itemId': item['item_id'],
+                'name': item['name'],
+                'reason': 'Expired' if item['expiry_date'] and item['expiry_date'] <= today else 'Out of Uses'
             })
             
-            if item[12]:  # If in a container
+            if item['container_id']:  # If in a container
                 return_plan.append({
                     'step': len(return_plan) + 1,
-                    'itemId': item[0],
-                    'itemName': item[1],
-                    'fromContainer': item[12],
+                    'itemId': item['item_id'],
+                    'itemName': item['name'],
+                    'fromContainer': item['container_id'],
                     'toContainer': request.undockingContainerId
                 })
             
-            total_weight += item[6]
+            total_weight += item['mass']
+        
+        # Calculate retrieval steps (simplified), finding the blocking items
+        # for every target in a single query
+        target_ids = [item['item_id'] for item in waste_items if item['container_id']]
+        blocking_items = get_blocking_items(conn, target_ids) if target_ids else {}
         
-        # Calculate retrieval steps (simplified)
         retrieval_steps = []
-        for item in waste_items:
-            if item[12]:
-                steps = calculate_retrieval_steps(item[12], item[0])
-                retrieval_steps.extend(steps)
+        for item_id in target_ids:
+            retrieval_steps.extend(removal_steps(blocking_items.get(item_id, [])))
         
         return ReturnPlanResponse(
             success=True,
@@ -594,7 +897,7 @@ async def waste_return_plan(request: ReturnPlanRequest):
                 'undockingContainerId': request.undockingContainerId,
                 'undockingDate': request.undockingDate,
                 'returnItems': return_items,
-                'totalVolume': sum(i[2]*i[3]*i[4] for i in waste_items),
+                'totalVolume': sum(i['width'] * i['depth'] * i['height'] for i in waste_items),
                 'totalWeight': total_weight
             }
         )
@@ -602,21 +905,25 @@ async def waste_return_plan(request: ReturnPlanRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/waste/complete-undocking", response_model=UndockingResponse)
-async def complete_undocking(request: UndockingRequest):
+async def complete_undocking(request: UndockingRequest, conn: sqlite3.Connection = Depends(get_conn)):
     try:
+        cursor = conn.cursor()
         cursor.execute('DELETE FROM items WHERE is_waste = 1')
         count = cursor.rowcount
         conn.commit()
+        items_changed()
         
         log_action(None, "undocking", None, f"Completed undocking of container {request.undockingContainerId}")
+        await FastAPICache.clear()
         
         return UndockingResponse(success=True, itemsRemoved=count)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/simulate/day", response_model=SimulateResponse)
-async def simulate_day(request: SimulateRequest):
+async def simulate_day(request: SimulateRequest, conn: sqlite3.Connection = Depends(get_conn)):
     try:
+        cursor = conn.cursor()
         current_date = datetime.utcnow()
         
         if request.numOfDays:
@@ -630,37 +937,39 @@ async def simulate_day(request: SimulateRequest):
         items_expired = []
         items_depleted = []
         
+        cursor.execute('BEGIN IMMEDIATE')
+        
         # Process items to be used
         for item_usage in request.itemsToBeUsedPerDay:
             item_id = item_usage.get('itemId')
             item_name = item_usage.get('name')
             
             if item_id:
-                cursor.execute('SELECT * FROM items WHERE item_id = ?', (item_id,))
+                cursor.execute(ITEM_BY_ID_SQL, (item_id,))
             else:
                 cursor.execute('SELECT * FROM items WHERE name = ?', (item_name,))
             
             item = cursor.fetchone()
             
             if item:
-                if item[9] is not None:  # remaining_uses
-                    new_uses = item[9] - 1
-                    cursor.execute('UPDATE items SET remaining_uses = ? WHERE item_id = ?', (new_uses, item[0]))
+                if item['remaining_uses'] is not None:
+                    new_uses = item['remaining_uses'] - 1
+                    cursor.execute(USE_ITEM_SQL, (new_uses, item['item_id']))
                     
                     if new_uses <= 0:
                         items_depleted.append({
-                            'itemId': item[0],
-                            'name': item[1]
+                            'itemId': item['item_id'],
+                            'name': item['name']
                         })
                 
                 items_used.append({
-                    'itemId': item[0],
-                    'name': item[1],
-                    'remainingUses': new_uses if item[9] is not None else None
+                    'itemId': item['item_id'],
+                    'name': item['name'],
+                    'remainingUses': new_uses if item['remaining_uses'] is not None else None
                 })
         
         # Check for expired items
-        check_item_expiry()
+        check_item_expiry(conn)
         cursor.execute('''
         SELECT item_id, name FROM items 
         WHERE is_waste = 1 AND expiry_date <= ?
@@ -669,11 +978,13 @@ async def simulate_day(request: SimulateRequest):
         
         for item in expired_items:
             items_expired.append({
-                'itemId': item[0],
-                'name': item[1]
+                'itemId': item['item_id'],
+                'name': item['name']
             })
         
         conn.commit()
+        items_changed()
+        await FastAPICache.clear()
         
         return SimulateResponse(
             success=True,
@@ -685,84 +996,120 @@ async def simulate_day(request: SimulateRequest):
             }
         )
     except Exception as e:
+        conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/import/items")
-async def import_items(file: UploadFile = File(...)):
+async def import_items(file: UploadFile = File(...), conn: sqlite3.Connection = Depends(get_conn)):
     try:
         contents = await file.read()
         text = io.StringIO(contents.decode('utf-8'))
-        reader = csv.DictReader(text)
+        reader = csv.reader(text)
         
-        imported = 0
+        header = next(reader, [])
+        col = {name: index for index, name in enumerate(header)}
+        # As DictReader did: skip blank lines without numbering them and
+        # read missing trailing cells as None
+        records = (row + [None] * (len(header) - len(row)) for row in reader if row)
+        try:
+            item_id, name = col['Item ID'], col['Name']
+            width, depth, height = col['Width (cm)'], col['Depth (cm)'], col['Height (cm)']
+            mass, priority = col['Mass (kg)'], col['Priority (1-100)']
+            expiry, usage, zone = col['Expiry Date (ISO Format)'], col['Usage Limit'], col['Preferred Zone']
+        except KeyError as e:
+            # A missing column fails every row, as the per-row lookups did
+            errors = [{'row': i, 'message': str(e)} for i, _ in enumerate(records, 1)]
+            return {"success": True, "itemsImported": 0, "errors": errors}
+        
+        rows = []
         errors = []
         
-        for i, row in enumerate(reader, 1):
+        for i, row in enumerate(records, 1):
             try:
-                cursor.execute('''
-                INSERT INTO items (
-                    item_id, name, width, depth, height, mass, priority,
-                    expiry_date, usage_limit, remaining_uses, preferred_zone,
-                    is_waste
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    row['Item ID'],
-                    row['Name'],
-                    float(row['Width (cm)']),
-                    float(row['Depth (cm)']),
-                    float(row['Height (cm)']),
-                    float(row['Mass (kg)']),
-                    int(row['Priority (1-100)']),
-                    row['Expiry Date (ISO Format)'] if row['Expiry Date (ISO Format)'] else None,
-                    int(row['Usage Limit']) if row['Usage Limit'] else None,
-                    int(row['Usage Limit']) if row['Usage Limit'] else None,
-                    row['Preferred Zone'],
+                usage_limit = int(row[usage]) if row[usage] else None
+                rows.append((i, (
+                    row[item_id],
+                    row[name],
+                    float(row[width]),
+                    float(row[depth]),
+                    float(row[height]),
+                    float(row[mass]),
+                    int(row[priority]),
+                    row[expiry] if row[expiry] else None,
+                    usage_limit,
+                    usage_limit,
+                    row[zone],
                     0
-                ))
-                imported += 1
+                )))
             except Exception as e:
                 errors.append({'row': i, 'message': str(e)})
         
-        conn.commit()
+        imported = insert_rows(conn, '''
+        INSERT INTO items (
+            item_id, name, width, depth, height, mass, priority,
+            expiry_date, usage_limit, remaining_uses, preferred_zone,
+            is_waste
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows, errors)
+        items_changed()
+        await FastAPICache.clear()
+        
         return {"success": True, "itemsImported": imported, "errors": errors}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/import/containers")
-async def import_containers(file: UploadFile = File(...)):
+async def import_containers(file: UploadFile = File(...), conn: sqlite3.Connection = Depends(get_conn)):
     try:
         contents = await file.read()
         text = io.StringIO(contents.decode('utf-8'))
-        reader = csv.DictReader(text)
+        reader = csv.reader(text)
+        
+        header = next(reader, [])
+        col = {name: index for index, name in enumerate(header)}
+        # As DictReader did: skip blank lines without numbering them and
+        # read missing trailing cells as None
+        records = (row + [None] * (len(header) - len(row)) for row in reader if row)
+        try:
+            container_id, zone = col['Container ID'], col['Zone']
+            width, depth, height = col['Width(cm)'], col['Depth(cm)'], col['Height(height)']
+        except KeyError as e:
+            # A missing column fails every row, as the per-row lookups did
+            errors = [{'row': i, 'message': str(e)} for i, _ in enumerate(records, 1)]
+            return {"success": True, "containersImported": 0, "errors": errors}
         
-        imported = 0
+        rows = []
         errors = []
         
-        for i, row in enumerate(reader, 1):
+        for i, row in enumerate(records, 1):
             try:
-                cursor.execute('''
-                INSERT OR REPLACE INTO containers (
-                    container_id, zone, width, depth, height
-                ) VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    row['Container ID'],
-                    row['Zone'],
-                    float(row['Width(cm)']),
-                    float(row['Depth(cm)']),
-                    float(row['Height(height)'])
-                ))
-                imported += 1
+                rows.append((i, (
+                    row[container_id],
+                    row[zone],
+                    float(row[width]),
+                    float(row[depth]),
+                    float(row[height])
+                )))
             except Exception as e:
                 errors.append({'row': i, 'message': str(e)})
         
-        conn.commit()
+        imported = insert_rows(conn, '''
+        INSERT OR REPLACE INTO containers (
+            container_id, zone, width, depth, height
+        ) VALUES (?, ?, ?, ?, ?)
+        ''', rows, errors)
+        container_cache.clear()
+        await FastAPICache.clear()
+        
         return {"success": True, "containersImported": imported, "errors": errors}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/export/arrangement")
-async def export_arrangement():
+@cache(expire=5)
+async def export_arrangement(conn: sqlite3.Connection = Depends(get_conn)):
     try:
+        cursor = conn.cursor()
         cursor.execute('''
         SELECT 
             i.item_id, 
@@ -773,25 +1120,33 @@ async def export_arrangement():
         WHERE i.container_id IS NOT NULL
         ''')
         
-        rows = cursor.fetchall()
-        csv_data = "Item ID,Container ID,Coordinates (W1,D1,H1),(W2,D2,H2)\n"
-        
-        for row in rows:
-            csv_data += f"{row[0]},{row[1]},({row[2]},{row[3]},{row[4]}),({row[5]},{row[6]},{row[7]})\n"
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator='\n')
+        writer.writerow(['Item ID', 'Container ID', 'Coordinates (W1,D1,H1)', '(W2,D2,H2)'])
+        writer.writerows(
+            (row[0], row[1], f"({row[2]},{row[3]},{row[4]})", f"({row[5]},{row[6]},{row[7]})")
+            for row in cursor
+        )
         
-        return {"success": True, "csv": csv_data}
+        return {"success": True, "csv": buf.getvalue()}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/logs", response_model=LogsResponse)
+@cache(expire=5)
 async def get_logs(
     startDate: Optional[str] = None,
     endDate: Optional[str] = None,
     itemId: Optional[str] = None,
     userId: Optional[str] = None,
-    actionType: Optional[str] = None
+    actionType: Optional[str] = None,
+    conn: sqlite3.Connection = Depends(get_conn)
 ):
     try:
+        # Write out queued rows first so callers see their own actions
+        await flush_logs()
+        
+        cursor = conn.cursor()
         query = 'SELECT * FROM logs'
         conditions = []
         params = []
@@ -821,11 +1176,11 @@ async def get_logs(
         logs = cursor.fetchall()
         
         return LogsResponse(logs=[{
-            'timestamp': log[1],
-            'userId': log[2],
-            'actionType': log[3],
-            'itemId': log[4],
-            'details': log[5]
+            'timestamp': log['timestamp'],
+            'userId': log['user_id'],
+            'actionType': log['action_type'],
+            'itemId': log['item_id'],
+            'details': log['details']
         } for log in logs])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))